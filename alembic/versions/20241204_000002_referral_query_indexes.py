@@ -0,0 +1,44 @@
+"""Align friendship/user indexes with referral query patterns
+
+Friend-list pages filter by user_id and keyset-paginate on the
+friendship id (ORDER BY id DESC, id < cursor), so a composite
+(user_id, id DESC) index serves each page without a sort node and makes
+the single-column user_id index redundant. users.referred_by_id is a FK
+traversed by "my referrals" queries but had no index at all.
+
+Revision ID: 20241204_000002
+Revises: 20241204_000001
+Create Date: 2024-12-04 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20241204_000002'
+down_revision: Union[str, None] = '20241204_000001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite index serves "friends of X, newest first" keyset pages
+    # directly; the single-column user_id index becomes redundant
+    op.drop_index('ix_friendships_user_id', table_name='friendships')
+    op.create_index(
+        'ix_friendships_user_page',
+        'friendships',
+        ['user_id', sa.text('id DESC')]
+    )
+
+    # FK used by "my referrals" lookups, previously unindexed
+    op.create_index('ix_users_referred_by_id', 'users', ['referred_by_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_referred_by_id', table_name='users')
+    op.drop_index('ix_friendships_user_page', table_name='friendships')
+    op.create_index('ix_friendships_user_id', 'friendships', ['user_id'])
@@ -0,0 +1,44 @@
+"""Add denormalized users.referrals_count
+
+Referral stats ran SELECT count(*) over users per /social/my-referral
+call. The count is now maintained as a column incremented when a
+referral is applied; backfilled here from the existing referred_by_id
+data.
+
+Revision ID: 20241204_000003
+Revises: 20241204_000002
+Create Date: 2024-12-04 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20241204_000003'
+down_revision: Union[str, None] = '20241204_000002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('referrals_count', sa.BigInteger(), nullable=False, server_default='0')
+    )
+
+    # Backfill from existing referral links
+    op.execute(
+        """
+        UPDATE users SET referrals_count = (
+            SELECT count(*) FROM users AS referred
+            WHERE referred.referred_by_id = users.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'referrals_count')
@@ -0,0 +1,41 @@
+"""Make users.referred_by_id ON DELETE SET NULL
+
+User deletion previously needed an explicit UPDATE to clear dangling
+referred_by_id links before the DELETE. With the cascade action on the
+constraint the database clears them itself, so deletes are a single
+statement.
+
+Revision ID: 20241204_000004
+Revises: 20241204_000003
+Create Date: 2024-12-04 00:00:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20241204_000004'
+down_revision: Union[str, None] = '20241204_000003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('fk_users_referred_by', 'users', type_='foreignkey')
+    op.create_foreign_key(
+        'fk_users_referred_by',
+        'users', 'users',
+        ['referred_by_id'], ['id'],
+        ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_users_referred_by', 'users', type_='foreignkey')
+    op.create_foreign_key(
+        'fk_users_referred_by',
+        'users', 'users',
+        ['referred_by_id'], ['id']
+    )
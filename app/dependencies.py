@@ -2,7 +2,9 @@
 FastAPI dependencies for authentication and authorization.
 """
 
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -17,6 +19,99 @@ from app.services.user_service import user_service
 # HTTP Bearer token scheme
 security = HTTPBearer(auto_error=False)
 
+# Cache of already-decoded tokens (token string -> payload dict).
+# Verifying the HMAC signature and parsing the JSON payload is the dominant
+# per-request CPU cost for authenticated traffic, and the same token is sent
+# on every request for its whole lifetime. Bounded LRU so a flood of unique
+# tokens cannot grow memory without limit.
+_TOKEN_CACHE_MAX_SIZE = 10_000
+_token_cache: OrderedDict[str, dict] = OrderedDict()
+
+# JWT codec bound once: avoids re-encoding the secret string to bytes,
+# rebuilding the algorithms list and re-resolving settings attributes on
+# every verification
+_jwt_codec = jwt.PyJWT()
+_JWT_SECRET = settings.jwt_secret.encode("utf-8")
+_JWT_ALGORITHMS = [settings.jwt_algorithm]
+
+
+def _decode_token(token: str) -> dict:
+    """
+    Decode and validate a JWT, caching results by the raw token string.
+
+    On a cache hit only the expiration timestamp is re-checked (cheap int
+    compare), skipping the HMAC verification and JSON parsing entirely.
+
+    Args:
+        token: Raw JWT token string
+
+    Returns:
+        Decoded token payload
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired
+        jwt.InvalidTokenError: If the token is invalid
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            _token_cache.move_to_end(token)
+            return payload
+        # Expired while cached - drop it and fail like jwt.decode would
+        del _token_cache[token]
+        raise jwt.ExpiredSignatureError("Signature has expired")
+
+    payload = _jwt_codec.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS)
+
+    _token_cache[token] = payload
+    if len(_token_cache) > _TOKEN_CACHE_MAX_SIZE:
+        _token_cache.popitem(last=False)
+
+    return payload
+
+
+async def _try_auth(
+    credentials: Optional[HTTPAuthorizationCredentials],
+    db: AsyncSession
+) -> Tuple[Optional[User], Optional[str]]:
+    """
+    Resolve the authenticated user from bearer credentials, if possible.
+
+    Shared implementation for get_current_user and get_current_user_optional.
+    Reports failures via the returned reason instead of raising, so the
+    optional dependency does not pay for exception handling on every
+    anonymous request.
+
+    Args:
+        credentials: HTTP Bearer credentials
+        db: Database session
+
+    Returns:
+        Tuple of (user or None, failure reason or None)
+    """
+    if not credentials:
+        return None, "Missing authentication token"
+
+    try:
+        # Decode and validate token (cached across requests for the same token)
+        payload = _decode_token(credentials.credentials)
+    except jwt.ExpiredSignatureError:
+        return None, "Token has expired"
+    except jwt.InvalidTokenError as e:
+        return None, f"Invalid token: {str(e)}"
+
+    # Extract user ID from token
+    user_id = payload.get("sub")
+    if not user_id:
+        return None, "Invalid token: missing user ID"
+
+    # Fetch user from database
+    user = await user_service.get_by_id(db, int(user_id))
+    if not user:
+        return None, "User not found"
+
+    return user, None
+
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -24,70 +119,28 @@ async def get_current_user(
 ) -> User:
     """
     Dependency to get the current authenticated user.
-    
+
     Extracts and validates the JWT token from the Authorization header,
     then fetches the user from the database.
-    
+
     Args:
         credentials: HTTP Bearer credentials
         db: Database session
-        
+
     Returns:
         User object
-        
+
     Raises:
         HTTPException: If token is missing, invalid, or user not found
     """
-    if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authentication token",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    token = credentials.credentials
-    
-    try:
-        # Decode and validate token
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm]
-        )
-        
-        # Extract user ID from token
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing user ID",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
-        # Fetch user from database
-        user = await user_service.get_by_id(db, int(user_id))
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
-        return user
-        
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    except jwt.InvalidTokenError as e:
+    user, reason = await _try_auth(credentials, db)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid token: {str(e)}",
+            detail=reason,
             headers={"WWW-Authenticate": "Bearer"}
         )
+    return user
 
 
 async def get_current_user_optional(
@@ -96,23 +149,18 @@ async def get_current_user_optional(
 ) -> Optional[User]:
     """
     Dependency to optionally get the current user.
-    
+
     Similar to get_current_user but returns None instead of raising
     an exception if authentication fails.
-    
+
     Args:
         credentials: HTTP Bearer credentials
         db: Database session
-        
+
     Returns:
         User object or None
     """
-    if not credentials:
-        return None
-    
-    try:
-        return await get_current_user(credentials, db)
-    except HTTPException:
-        return None
+    user, _ = await _try_auth(credentials, db)
+    return user
 
 
@@ -4,39 +4,140 @@ WattsTap Referral Service - Main application entry point.
 FastAPI application for handling referral system in WattsTap Telegram Mini App.
 """
 
+import logging
+import queue
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app import __version__
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, prewarm_pool
 from app.routers import auth_router, social_router
 from app.routers.dev import router as dev_router
 
+logger = logging.getLogger("app")
+
+
+def _setup_logging() -> QueueListener:
+    """
+    Configure queue-based logging.
+
+    Log calls on the event loop only enqueue the record; formatting and
+    stdout writes happen on the listener's background thread, so error
+    spikes don't block request handling.
+
+    Returns:
+        Started QueueListener (stop it on shutdown)
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
+    return listener
+
+
+def _register_fast_hs256() -> None:
+    """
+    Swap PyJWT's HS256 implementation for an OpenSSL-backed one.
+
+    cryptography's HMAC runs in C and releases the GIL during the
+    digest, so token signing/verification is faster and other threads
+    can progress. No-op if cryptography is not installed; PyJWT then
+    keeps its stdlib hmac implementation.
+    """
+    try:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives import hmac as crypto_hmac
+    except ImportError:
+        return
+
+    import jwt
+    from jwt.algorithms import HMACAlgorithm
+
+    class FastHS256(HMACAlgorithm):
+        """HS256 with OpenSSL-backed sign/verify; key handling inherited."""
+
+        def __init__(self):
+            super().__init__(HMACAlgorithm.SHA256)
+
+        def sign(self, msg, key):
+            h = crypto_hmac.HMAC(key, hashes.SHA256())
+            h.update(msg)
+            return h.finalize()
+
+        def verify(self, msg, key, sig):
+            h = crypto_hmac.HMAC(key, hashes.SHA256())
+            h.update(msg)
+            try:
+                h.verify(sig)
+                return True
+            except InvalidSignature:
+                return False
+
+    # Global registry: the one PyJWT < 2.10 codec instances delegate to
+    jwt.unregister_algorithm("HS256")
+    jwt.register_algorithm("HS256", FastHS256())
+
+    # PyJWT >= 2.10 gives every PyJWT() its own algorithm registry
+    # snapshot at construction, so the codecs bound at import on the hot
+    # paths must be patched directly or the swap above never reaches a
+    # single issued/verified token
+    from app.dependencies import _jwt_codec as deps_codec
+    from app.routers.auth import _jwt_codec as auth_codec
+
+    for codec in (deps_codec, auth_codec):
+        jws = getattr(codec, "_jws", None)
+        if jws is not None:
+            jws.unregister_algorithm("HS256")
+            jws.register_algorithm("HS256", FastHS256())
+
+        # Both implementations sign identically, so a silent revert is
+        # invisible to tests - verify the wiring explicitly
+        effective = (jws or jwt.api_jws).get_algorithm_by_name("HS256")
+        if not isinstance(effective, FastHS256):
+            logger.warning(
+                "FastHS256 not in effect for JWT codec; still using %s",
+                type(effective).__name__
+            )
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan handler.
-    
+
     Initializes database on startup and closes connections on shutdown.
     """
     # Startup
-    print(f"Starting {settings.app_name} v{__version__}")
-    print(f"Environment: {settings.app_env}")
-    print(f"Debug mode: {settings.debug}")
-    
+    listener = _setup_logging()
+    _register_fast_hs256()
+    logger.info("Starting %s v%s", settings.app_name, __version__)
+    logger.info("Environment: %s", settings.app_env)
+    logger.info("Debug mode: %s", settings.debug)
+
     await init_db()
-    print("Database initialized")
-    
+    await prewarm_pool()
+    logger.info("Database initialized")
+
     yield
-    
+
     # Shutdown
     await close_db()
-    print("Database connections closed")
+    logger.info("Database connections closed")
+    listener.stop()
 
 
 # Create FastAPI application
@@ -62,6 +163,8 @@ app = FastAPI(
     """,
     version=__version__,
     lifespan=lifespan,
+    # orjson serializes responses several times faster than stdlib json
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
 )
@@ -80,8 +183,8 @@ app.add_middleware(
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle uncaught exceptions."""
-    print(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    logger.exception("Unhandled exception", exc_info=exc)
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -146,7 +249,9 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop",
+        http="httptools"
     )
 
 
@@ -5,7 +5,7 @@ Friendship model for storing friend relationships.
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, desc, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -21,7 +21,15 @@ class Friendship(Base):
     For mutual friendship, two records are created:
     - user_id -> friend_id
     - friend_id -> user_id
-    
+
+    Design note: a single canonicalized row per pair (LEAST/GREATEST
+    columns plus an OR filter) would halve storage and write
+    amplification, but was considered and rejected: both rows of a pair
+    are written in one batched INSERT anyway, and the two-row form keeps
+    "friends of X" a plain indexed equality filter that ORM
+    relationships and the (user_id, created_at DESC) index serve
+    directly, instead of an OR over two columns on every read.
+
     Attributes:
         id: Primary key
         user_id: The user who has this friend
@@ -32,15 +40,18 @@ class Friendship(Base):
     
     __tablename__ = "friendships"
     
-    # Primary key
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # Primary key (plain INTEGER on SQLite so autoincrement works in tests)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True
+    )
     
     # Friend relationship
     user_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     friend_id: Mapped[int] = mapped_column(
         BigInteger,
@@ -75,9 +86,14 @@ class Friendship(Base):
         foreign_keys=[friend_id]
     )
     
-    # Constraints
+    # Constraints and indexes
     __table_args__ = (
         UniqueConstraint("user_id", "friend_id", name="uq_friendship_user_friend"),
+        # Serves the friends keyset pages (filter by user_id, ORDER BY
+        # id DESC with an id < cursor bound) and the friends COUNT
+        # without a sort; replaces the redundant single-column user_id
+        # index
+        Index("ix_friendships_user_page", "user_id", desc("id")),
     )
     
     def __repr__(self) -> str:
@@ -7,7 +7,7 @@ import string
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, String, func
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -16,6 +16,15 @@ if TYPE_CHECKING:
     from app.models.friendship import Friendship
 
 
+# Referral-code alphabet: uppercase letters and digits, excluding
+# confusing characters (0, O, I, L, 1). Built once at import instead of
+# via chained .replace calls on every code generation.
+_REFERRAL_ALPHABET = "".join(
+    c for c in (string.ascii_uppercase + string.digits) if c not in "0OIL1"
+)
+_SYSRAND = secrets.SystemRandom()
+
+
 class User(Base):
     """
     User model representing a player in the game.
@@ -35,6 +44,7 @@ class User(Base):
         
         referral_code: Unique code for inviting others
         referred_by_id: ID of user who invited this user
+        referrals_count: Number of users this user has referred
         
         created_at: When user was created
         updated_at: When user was last updated
@@ -42,9 +52,17 @@ class User(Base):
     """
     
     __tablename__ = "users"
-    
-    # Primary key
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    # Fetch server-generated defaults (created_at, last_login_at, ...)
+    # inline with the INSERT's RETURNING instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Primary key (plain INTEGER on SQLite so autoincrement works in tests)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True
+    )
     
     # Telegram data
     telegram_id: Mapped[int] = mapped_column(
@@ -72,9 +90,20 @@ class User(Base):
         index=True
     )
     referred_by_id: Mapped[Optional[int]] = mapped_column(
-        BigInteger, 
-        ForeignKey("users.id"), 
-        nullable=True
+        BigInteger,
+        # Deleting a referrer clears the link in-database, so user
+        # deletes are a single DELETE with no cleanup UPDATE
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+    # Denormalized count of users referred by this user, maintained in
+    # apply_referral so referral stats don't need a COUNT query
+    referrals_count: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        server_default="0",
+        nullable=False
     )
     
     # Timestamps
@@ -139,11 +168,9 @@ class User(Base):
         Returns:
             Generated referral code
         """
-        # Use uppercase letters and digits, excluding similar-looking characters
-        alphabet = string.ascii_uppercase + string.digits
-        # Remove confusing characters: 0, O, I, L, 1
-        alphabet = alphabet.replace('0', '').replace('O', '').replace('I', '').replace('L', '').replace('1', '')
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
+        # choices() draws all characters in one C-level call instead of
+        # `length` Python-level secrets.choice calls
+        return ''.join(_SYSRAND.choices(_REFERRAL_ALPHABET, k=length))
 
 
 
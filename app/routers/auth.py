@@ -2,7 +2,7 @@
 Authentication API endpoints.
 """
 
-from datetime import datetime, timedelta
+from time import time
 
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -22,27 +22,38 @@ from app.services.referral_service import referral_service
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Token lifetime in seconds, resolved once at import
+_JWT_TTL = settings.jwt_expiration_seconds
+
+# JWT codec bound once: avoids re-encoding the secret string to bytes
+# and re-resolving settings attributes on every token issued
+_jwt_codec = jwt.PyJWT()
+_JWT_SECRET = settings.jwt_secret.encode("utf-8")
+_JWT_ALGORITHM = settings.jwt_algorithm
+
 
 def create_jwt_token(user_id: int, telegram_id: int) -> str:
     """
     Create a JWT access token.
-    
+
     Args:
         user_id: Internal user ID
         telegram_id: Telegram user ID
-        
+
     Returns:
         JWT token string
     """
-    now = datetime.utcnow()
+    # Integer epoch seconds: same claims as before, but PyJWT skips the
+    # datetime-to-timestamp conversion and no timedelta is allocated
+    now = int(time())
     payload = {
         "sub": str(user_id),
         "telegram_id": telegram_id,
         "iat": now,
-        "exp": now + timedelta(seconds=settings.jwt_expiration_seconds),
+        "exp": now + _JWT_TTL,
         "type": "access"
     }
-    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return _jwt_codec.encode(payload, _JWT_SECRET, algorithm=_JWT_ALGORITHM)
 
 
 @router.post(
@@ -90,23 +101,23 @@ async def authenticate_telegram(
     # 2. Determine referral code (explicit parameter takes priority over start_param)
     referral_code = request.referral_code or parsed_data.start_param
     
-    # 3. Find existing user or create new one
-    user = await user_service.get_by_telegram_id(db, telegram_user.id)
+    # 3. Find existing user and referral-code owner in one round-trip
+    user, referrer = await user_service.get_login_pair(
+        db, telegram_user.id, referral_code
+    )
     is_new_player = user is None
     referral_result = None
-    
+
     if is_new_player:
         # --- NEW USER FLOW ---
-        
+
         # Check referral code before creating user
-        referrer = None
         if referral_code:
-            referrer = await user_service.get_by_referral_code(db, referral_code)
-            
             if referrer:
-                # Validate referral can be applied
-                can_apply, reason = await referral_service.can_apply_referral(
-                    db, telegram_user.id, referrer
+                # Validate referral can be applied (user is None here -
+                # the lookup above already established they're new)
+                can_apply, reason = referral_service.can_apply_referral(
+                    telegram_user.id, referrer, user
                 )
                 if not can_apply:
                     # Invalid referral, but continue with registration
@@ -138,8 +149,9 @@ async def authenticate_telegram(
     else:
         # --- EXISTING USER FLOW ---
         
-        # Update last login
-        await user_service.update_last_login(db, user)
+        # Stamp last login (single UPDATE; would also carry any login
+        # watts reward if one is ever granted)
+        await user_service.update_login_and_watts(db, user)
         
         # Referral codes can only be applied on first login
         if referral_code:
@@ -4,7 +4,7 @@ Only available in non-production environments.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete
+from sqlalchemy import delete, or_, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -15,8 +15,13 @@ from app.models.friendship import Friendship
 router = APIRouter(prefix="/dev", tags=["Development"])
 
 
-def check_dev_mode():
-    """Dependency to ensure we're not in production."""
+async def check_dev_mode():
+    """
+    Dependency to ensure we're not in production.
+
+    Async so FastAPI runs it on the event loop instead of dispatching
+    it to the threadpool like it does for plain-def dependencies.
+    """
     if settings.is_production:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -32,15 +37,23 @@ def check_dev_mode():
 )
 async def reset_all(db: AsyncSession = Depends(get_db)):
     """Delete all users and friendships for testing."""
-    
-    # Delete all friendships first (foreign key constraint)
-    await db.execute(delete(Friendship))
-    
-    # Delete all users
-    await db.execute(delete(User))
-    
+
+    if db.bind.dialect.name == "postgresql":
+        # TRUNCATE is O(1) metadata work: no per-row scan or WAL entries
+        # like DELETE, and both tables reset in one statement
+        await db.execute(
+            text("TRUNCATE TABLE friendships, users RESTART IDENTITY CASCADE")
+        )
+    else:
+        # Fallback for backends without TRUNCATE ... CASCADE (SQLite tests)
+        # Delete all friendships first (foreign key constraint)
+        await db.execute(delete(Friendship))
+
+        # Delete all users
+        await db.execute(delete(User))
+
     await db.commit()
-    
+
     return {"message": "All users and friendships deleted", "status": "ok"}
 
 
@@ -55,43 +68,85 @@ async def reset_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a specific user by Telegram ID."""
-    
-    from sqlalchemy import select, or_
-    
-    # Find user
-    result = await db.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with telegram_id {telegram_id} not found"
+
+    if db.bind.dialect.name == "postgresql":
+        # Single statement: the ON DELETE CASCADE on friendships and
+        # ON DELETE SET NULL on referred_by_id do the related-row
+        # cleanup in-database, the CTE decrements the referrer's
+        # denormalized referrals_count (increment-only otherwise, so it
+        # would drift after a delete), and the final SELECT doubles as
+        # the existence check - one round trip total
+        result = await db.execute(
+            text(
+                """
+                WITH deleted AS (
+                    DELETE FROM users WHERE telegram_id = :tid
+                    RETURNING id, referred_by_id
+                ),
+                decremented AS (
+                    UPDATE users
+                    SET referrals_count = referrals_count - 1
+                    WHERE id IN (
+                        SELECT referred_by_id FROM deleted
+                        WHERE referred_by_id IS NOT NULL
+                    )
+                )
+                SELECT id FROM deleted
+                """
+            ),
+            {"tid": telegram_id}
         )
-    
-    # Delete friendships where user is involved
-    await db.execute(
-        delete(Friendship).where(
-            or_(
-                Friendship.user_id == user.id,
-                Friendship.friend_id == user.id
+        deleted_id = result.scalar_one_or_none()
+
+        if deleted_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with telegram_id {telegram_id} not found"
             )
+
+        await db.commit()
+    else:
+        # Fallback for backends without data-modifying CTEs (SQLite tests)
+        result = await db.execute(
+            select(User).where(User.telegram_id == telegram_id)
         )
-    )
-    
-    # Clear referred_by for users who were referred by this user
-    from sqlalchemy import update
-    await db.execute(
-        update(User)
-        .where(User.referred_by_id == user.id)
-        .values(referred_by_id=None)
-    )
-    
-    # Delete the user
-    await db.delete(user)
-    await db.commit()
-    
+        user = result.scalar_one_or_none()
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with telegram_id {telegram_id} not found"
+            )
+
+        # Delete friendships where user is involved
+        await db.execute(
+            delete(Friendship).where(
+                or_(
+                    Friendship.user_id == user.id,
+                    Friendship.friend_id == user.id
+                )
+            )
+        )
+
+        # Clear referred_by for users who were referred by this user
+        await db.execute(
+            update(User)
+            .where(User.referred_by_id == user.id)
+            .values(referred_by_id=None)
+        )
+
+        # Keep the referrer's denormalized counter in step
+        if user.referred_by_id is not None:
+            await db.execute(
+                update(User)
+                .where(User.id == user.referred_by_id)
+                .values(referrals_count=User.referrals_count - 1)
+            )
+
+        # Delete the user
+        await db.delete(user)
+        await db.commit()
+
     return {
         "message": f"User {telegram_id} deleted",
         "status": "ok"
@@ -112,9 +167,9 @@ async def reset_friendships(db: AsyncSession = Depends(get_db)):
     # Delete all friendships
     await db.execute(delete(Friendship))
     
-    # Reset all referred_by connections
+    # Reset all referred_by connections and the counters derived from them
     await db.execute(
-        update(User).values(referred_by_id=None)
+        update(User).values(referred_by_id=None, referrals_count=0)
     )
     
     await db.commit()
@@ -2,7 +2,9 @@
 Social features API endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -18,6 +20,34 @@ from app.services.referral_service import referral_service
 
 router = APIRouter(prefix="/social", tags=["Social"])
 
+# Invite-link prefix is constant for the process lifetime; only the
+# user's referral code changes per request
+_INVITE_LINK_PREFIX = (
+    f"https://t.me/{settings.telegram_bot_username}/"
+    f"{settings.telegram_app_name}?startapp=REF_"
+)
+
+
+def _encode_cursor(friendship_id: int) -> str:
+    """Pack a keyset position into the opaque cursor string."""
+    return str(friendship_id)
+
+
+def _decode_cursor(cursor: str) -> int:
+    """
+    Unpack an opaque cursor into the friendship id it encodes.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 
 @router.get(
     "/my-referral",
@@ -43,7 +73,7 @@ async def get_my_referral(
     stats = await referral_service.get_referral_stats(db, current_user)
     
     # Build invite link
-    invite_link = f"https://t.me/{settings.telegram_bot_username}/{settings.telegram_app_name}?startapp=REF_{current_user.referral_code}"
+    invite_link = _INVITE_LINK_PREFIX + current_user.referral_code
     
     return MyReferralResponse(
         referral_code=current_user.referral_code,
@@ -59,49 +89,79 @@ async def get_my_referral(
     response_model=FriendsListResponse,
     summary="Get list of friends",
     description="""
-    Get list of all your friends.
-    
+    Get a page of your friends, newest first.
+
     Friends are added when:
     - Someone uses your referral code
     - You use someone's referral code
-    
+
     Returns information about each friend including the bonus you earned from them.
+    Pass the `nextCursor` value from the previous page as `?cursor=` to fetch the next page.
     """
 )
 async def get_friends(
+    limit: int = Query(50, ge=1, le=200, description="Maximum friends per page"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the previous page's nextCursor"
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> FriendsListResponse:
-    """Get current user's friends list."""
-    
-    # Get all friends
-    friends_data = await referral_service.get_friends(db, current_user)
+    """Get current user's friends list (paginated)."""
+
+    cursor_key = _decode_cursor(cursor) if cursor is not None else None
+
+    # Get one page of friends as plain column rows - no ORM hydration
+    friends_data = await referral_service.get_friends_raw(
+        db, current_user, limit=limit, cursor=cursor_key
+    )
     
     friends_list = []
-    total_bonus = 0
-    
-    for friend, friendship in friends_data:
-        # Calculate bonus from this friend
-        # We get bonus only if we referred them
-        your_bonus = 0
-        if friend.referred_by_id == current_user.id:
-            your_bonus = referral_service.bonus_per_referral
-            total_bonus += your_bonus
-        
-        friends_list.append(FriendInfo(
-            player_id=str(friend.id),
-            nickname=friend.display_name,
-            level=friend.level,
-            avatar_url=friend.photo_url,
-            total_earnings=friend.watts,
-            your_bonus=your_bonus,
-            invited_at=friendship.created_at
+    # Hoisted out of the loop: attribute lookups on the user and service
+    # would otherwise repeat per friend
+    me_id = current_user.id
+    bonus = referral_service.bonus_per_referral
+
+    # Every referred user earned us exactly one bonus, so the total is a
+    # single multiplication on the denormalized counter - no accumulator
+    total_bonus = current_user.referrals_count * bonus
+
+    for row in friends_data:
+        # model_construct skips per-field validation - these values come
+        # straight from the database and are already the right types
+        friends_list.append(FriendInfo.model_construct(
+            player_id=str(row.id),
+            # Mirrors User.display_name without hydrating a User object
+            nickname=row.username or row.first_name or f"User_{row.telegram_id}",
+            level=row.level,
+            avatar_url=row.photo_url,
+            total_earnings=row.watts,
+            # We get a bonus only from friends we referred
+            your_bonus=bonus if row.referred_by_id == me_id else 0,
+            invited_at=row.created_at
         ))
-    
-    return FriendsListResponse(
+
+    # Full page means there may be more: hand back a keyset cursor and
+    # get the real total with one indexed COUNT. A short first page IS
+    # the whole list, so no extra query is needed.
+    if len(friends_list) < limit and cursor is None:
+        total_friends = len(friends_list)
+        next_cursor = None
+    else:
+        total_friends = await referral_service.get_friends_count(
+            db, current_user.id
+        )
+        if len(friends_list) == limit:
+            next_cursor = _encode_cursor(friends_data[-1].friendship_id)
+        else:
+            next_cursor = None
+
+    return FriendsListResponse.model_construct(
         friends=friends_list,
-        total_friends=len(friends_list),
-        total_bonus_earned=total_bonus
+        total_friends=total_friends,
+        total_bonus_earned=total_bonus,
+        next_cursor=next_cursor
     )
 
 
@@ -4,7 +4,7 @@ Authentication related schemas.
 
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TelegramAuthRequest(BaseModel):
@@ -22,10 +22,8 @@ class TelegramAuthRequest(BaseModel):
         description="Optional referral code from invite link",
         max_length=16
     )
-    
-    model_config = {
-        "populate_by_name": True,
-    }
+
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ReferrerInfo(BaseModel):
@@ -36,9 +34,7 @@ class ReferrerInfo(BaseModel):
     avatar_url: Optional[str] = Field(None, alias="avatarUrl", description="Referrer's avatar URL")
     level: int = Field(..., description="Referrer's game level")
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 class ReferralResult(BaseModel):
@@ -53,9 +49,7 @@ class ReferralResult(BaseModel):
     )
     message: Optional[str] = Field(None, description="Status message")
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 class PlayerInfo(BaseModel):
@@ -67,9 +61,7 @@ class PlayerInfo(BaseModel):
     is_new_player: bool = Field(..., alias="isNewPlayer", description="Whether this is a new player")
     referral_code: str = Field(..., alias="referralCode", description="Player's own referral code")
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 class AuthResponse(BaseModel):
@@ -80,9 +72,7 @@ class AuthResponse(BaseModel):
     player: PlayerInfo = Field(..., description="Player information")
     referral: Optional[ReferralResult] = Field(None, description="Referral application result")
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 
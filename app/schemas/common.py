@@ -2,10 +2,10 @@
 Common schemas used across the application.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Generic, Optional, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 T = TypeVar("T")
 
@@ -24,14 +24,14 @@ class SuccessResponse(BaseModel, Generic[T]):
     success: bool = Field(default=True, description="Whether the request was successful")
     data: T = Field(..., description="Response data")
     server_time: datetime = Field(
-        default_factory=datetime.utcnow,
+        # Timezone-aware so orjson serializes it in one C call, and
+        # datetime.utcnow() is deprecated anyway
+        default_factory=lambda: datetime.now(timezone.utc),
         alias="serverTime",
         description="Server timestamp"
     )
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 class ErrorResponse(BaseModel):
@@ -40,14 +40,12 @@ class ErrorResponse(BaseModel):
     success: bool = Field(default=False, description="Always false for errors")
     error: ErrorDetail = Field(..., description="Error information")
     server_time: datetime = Field(
-        default_factory=datetime.utcnow,
+        default_factory=lambda: datetime.now(timezone.utc),
         alias="serverTime",
         description="Server timestamp"
     )
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 
@@ -5,7 +5,7 @@ Social features related schemas.
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FriendInfo(BaseModel):
@@ -27,9 +27,7 @@ class FriendInfo(BaseModel):
     )
     invited_at: datetime = Field(..., alias="invitedAt", description="When this friend was added")
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 class FriendsListResponse(BaseModel):
@@ -42,10 +40,13 @@ class FriendsListResponse(BaseModel):
         alias="totalBonusEarned",
         description="Total bonus earned from all friends"
     )
-    
-    model_config = {
-        "populate_by_name": True,
-    }
+    next_cursor: Optional[str] = Field(
+        None,
+        alias="nextCursor",
+        description="Opaque cursor; pass as ?cursor= to fetch the next page, null on the last page"
+    )
+
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 class MyReferralResponse(BaseModel):
@@ -69,9 +70,7 @@ class MyReferralResponse(BaseModel):
         description="Total bonus earned from referrals"
     )
     
-    model_config = {
-        "populate_by_name": True,
-    }
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="ignore")
 
 
 
@@ -4,8 +4,9 @@ Referral service for managing referral system.
 
 from typing import Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, raiseload
 
 from app.models.user import User
 from app.models.friendship import Friendship
@@ -21,39 +22,46 @@ class ReferralService:
     and calculating referral bonuses.
     """
     
+    def __init__(self):
+        # Resolved once: settings attribute access goes through
+        # Pydantic's descriptors and is not free in per-friend loops
+        self._bonus = settings.referral_bonus_watts
+
     @property
     def bonus_per_referral(self) -> int:
         """Bonus watts given for each successful referral."""
-        return settings.referral_bonus_watts
+        return self._bonus
     
-    async def can_apply_referral(
-        self, 
-        db: AsyncSession, 
-        new_user_telegram_id: int, 
-        referrer: User
+    def can_apply_referral(
+        self,
+        new_user_telegram_id: int,
+        referrer: User,
+        existing_user: Optional[User]
     ) -> Tuple[bool, str]:
         """
         Check if a referral code can be applied.
-        
+
+        Pure validation - the caller passes the result of the user
+        lookup authentication already performed, so no extra SELECT is
+        issued here.
+
         Args:
-            db: Database session
             new_user_telegram_id: Telegram ID of the new user
             referrer: User who owns the referral code
-            
+            existing_user: Previously fetched user for that Telegram ID,
+                or None if they don't exist yet
+
         Returns:
             Tuple of (can_apply, reason)
         """
         # Cannot invite yourself
         if referrer.telegram_id == new_user_telegram_id:
             return False, "Cannot use your own referral code"
-        
-        # Check if user already exists (referral only works for new users)
-        result = await db.execute(
-            select(User.id).where(User.telegram_id == new_user_telegram_id)
-        )
-        if result.scalar_one_or_none():
+
+        # Referral only works for new users
+        if existing_user is not None:
             return False, "Referral code can only be applied on first login"
-        
+
         return True, "OK"
     
     async def apply_referral(
@@ -81,26 +89,35 @@ class ReferralService:
         try:
             # 1. Set who referred the new user
             new_user.referred_by_id = referrer.id
-            
-            # 2. Create mutual friendship
-            # Referrer -> New User
-            friendship1 = Friendship(
-                user_id=referrer.id,
-                friend_id=new_user.id,
-                source="referral"
+
+            # 2. Create mutual friendship with one multi-row INSERT
+            # (referrer -> new user, new user -> referrer)
+            await db.execute(
+                insert(Friendship).values([
+                    {
+                        "user_id": referrer.id,
+                        "friend_id": new_user.id,
+                        "source": "referral"
+                    },
+                    {
+                        "user_id": new_user.id,
+                        "friend_id": referrer.id,
+                        "source": "referral"
+                    },
+                ])
             )
-            # New User -> Referrer
-            friendship2 = Friendship(
-                user_id=new_user.id,
-                friend_id=referrer.id,
-                source="referral"
+
+            # 3. Give bonus to referrer and bump their referral counter
+            # atomically server-side, safe under concurrent referrals
+            await db.execute(
+                update(User)
+                .where(User.id == referrer.id)
+                .values(
+                    watts=User.watts + self.bonus_per_referral,
+                    referrals_count=User.referrals_count + 1
+                )
             )
-            db.add(friendship1)
-            db.add(friendship2)
-            
-            # 3. Give bonus to referrer
-            referrer.watts += self.bonus_per_referral
-            
+
             await db.flush()
             
             return ReferralResult(
@@ -122,28 +139,100 @@ class ReferralService:
             )
     
     async def get_friends(
-        self, 
-        db: AsyncSession, 
-        user: User
+        self,
+        db: AsyncSession,
+        user: User,
+        limit: int = 50,
+        cursor: Optional[int] = None
     ) -> list[Tuple[User, Friendship]]:
         """
-        Get all friends of a user.
-        
+        Get a page of the user's friends, newest first.
+
+        Keyset pagination on the friendship id: ids are assigned in
+        insertion order, so descending id is newest-first and - unlike
+        a created_at cursor - can't skip friendships that share a
+        creation timestamp. Pass the friendship id of the last friend
+        from the previous page to fetch the next one. Rows read and
+        bytes serialized stay O(limit) regardless of how many friends
+        the user has.
+
         Args:
             db: Database session
             user: User to get friends for
-            
+            limit: Maximum number of friends to return
+            cursor: Only return friendships with a smaller id
+
         Returns:
             List of (friend_user, friendship) tuples
         """
-        result = await db.execute(
-            select(User, Friendship)
+        # One query: the explicit join pulls friend users in the same
+        # SELECT and contains_eager hydrates Friendship.friend from it,
+        # replacing selectinload's second WHERE IN roundtrip. raiseload
+        # makes any other lazy relationship access fail fast instead of
+        # silently degrading into N+1 queries
+        stmt = (
+            select(Friendship)
+            .join(User, User.id == Friendship.friend_id)
+            .options(contains_eager(Friendship.friend), raiseload("*"))
+            .where(Friendship.user_id == user.id)
+            .order_by(Friendship.id.desc())
+            .limit(limit)
+        )
+        if cursor is not None:
+            stmt = stmt.where(Friendship.id < cursor)
+
+        result = await db.execute(stmt)
+        return [(f.friend, f) for f in result.scalars()]
+    
+    async def get_friends_raw(
+        self,
+        db: AsyncSession,
+        user: User,
+        limit: int = 50,
+        cursor: Optional[int] = None
+    ) -> list:
+        """
+        Get a page of the user's friends as plain column rows.
+
+        Same query shape and pagination as get_friends, but selects only
+        the columns the friends endpoint serializes and skips ORM
+        hydration entirely - no identity map entries or instance state
+        per row, just tuples.
+
+        Args:
+            db: Database session
+            user: User to get friends for
+            limit: Maximum number of friends to return
+            cursor: Only return friendships with a smaller id
+
+        Returns:
+            List of rows with friend columns plus the friendship's
+            created_at and id (for building the next cursor)
+        """
+        stmt = (
+            select(
+                User.id,
+                User.username,
+                User.first_name,
+                User.telegram_id,
+                User.photo_url,
+                User.level,
+                User.watts,
+                User.referred_by_id,
+                Friendship.created_at,
+                Friendship.id.label("friendship_id"),
+            )
             .join(Friendship, Friendship.friend_id == User.id)
             .where(Friendship.user_id == user.id)
-            .order_by(Friendship.created_at.desc())
+            .order_by(Friendship.id.desc())
+            .limit(limit)
         )
+        if cursor is not None:
+            stmt = stmt.where(Friendship.id < cursor)
+
+        result = await db.execute(stmt)
         return result.all()
-    
+
     async def get_friends_count(
         self, 
         db: AsyncSession, 
@@ -180,19 +269,13 @@ class ReferralService:
         Returns:
             Dictionary with referral statistics
         """
-        # Count users referred by this user
-        result = await db.execute(
-            select(func.count(User.id))
-            .where(User.referred_by_id == user.id)
-        )
-        invited_count = result.scalar() or 0
-        
-        # Calculate total bonus earned
-        total_bonus = invited_count * self.bonus_per_referral
-        
+        # Served from the denormalized counter maintained in
+        # apply_referral - no COUNT query needed
+        invited_count = user.referrals_count
+
         return {
             "total_friends_invited": invited_count,
-            "total_bonus_earned": total_bonus,
+            "total_bonus_earned": invited_count * self.bonus_per_referral,
             "bonus_per_friend": self.bonus_per_referral
         }
     
@@ -7,13 +7,20 @@ Handles validation of initData from Telegram WebApp and parsing user information
 import hashlib
 import hmac
 import json
+import logging
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
-from urllib.parse import parse_qs, unquote
+from urllib.parse import unquote, unquote_plus
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Bound on the validated-initData cache (see TelegramAuthService)
+_VALIDATED_CACHE_MAX_SIZE = 50_000
+
 
 @dataclass
 class TelegramUser:
@@ -73,6 +80,11 @@ class TelegramAuthService:
         """
         self.bot_token = bot_token
         self._secret_key = self._compute_secret_key()
+        # Validated-initData cache: Telegram clients resend identical
+        # initData for its whole freshness window, so a repeat payload
+        # skips the HMAC verify, URL-decode and JSON parse. Keyed by a
+        # short blake2b digest of the raw string; bounded LRU.
+        self._validated_cache: "OrderedDict[bytes, ParsedInitData]" = OrderedDict()
     
     def _compute_secret_key(self) -> bytes:
         """
@@ -89,57 +101,68 @@ class TelegramAuthService:
             hashlib.sha256
         ).digest()
     
-    def validate_init_data(
-        self, 
-        init_data: str, 
-        max_age_seconds: int = 86400
+    @staticmethod
+    def _parse_query(init_data: str) -> dict:
+        """
+        Parse the initData query string into a flat {key: value} dict.
+
+        initData parameters never repeat, so a single-pass split beats
+        parse_qs, which pays for list-of-values dicts and repeat-param
+        handling we never need. unquote_plus matches parse_qs's decoding
+        of both %xx escapes and '+' as space.
+        """
+        parsed = {}
+        for pair in init_data.split("&"):
+            if not pair:
+                continue
+            key, _, value = pair.partition("=")
+            parsed[key] = unquote_plus(value)
+        return parsed
+
+    def _validate_parsed(
+        self,
+        parsed: dict,
+        max_age_seconds: int
     ) -> Tuple[bool, Optional[str]]:
         """
-        Validate initData from Telegram WebApp.
-        
+        Validate an already-parsed initData dict.
+
         Checks:
         1. Hash is present
         2. Hash matches computed hash
         3. auth_date is within max_age_seconds
-        
+
         Args:
-            init_data: Raw initData string from Telegram
-            max_age_seconds: Maximum age of initData in seconds (default 24h)
-            
+            parsed: Flat {key: value} dict from _parse_query
+            max_age_seconds: Maximum age of initData in seconds
+
         Returns:
             Tuple of (is_valid, error_message)
         """
         try:
-            # Parse query string
-            parsed = parse_qs(init_data, keep_blank_values=True)
-            
             # Extract and verify hash
-            received_hash = parsed.get("hash", [None])[0]
+            received_hash = parsed.get("hash")
             if not received_hash:
                 return False, "Missing hash in initData"
-            
+
             # Build data check string (all params except hash, sorted alphabetically)
-            data_check_arr = []
-            for key in sorted(parsed.keys()):
-                if key != "hash":
-                    value = parsed[key][0]
-                    data_check_arr.append(f"{key}={value}")
-            
-            data_check_string = "\n".join(data_check_arr)
-            
+            data_check_string = "\n".join(
+                f"{key}={parsed[key]}" for key in sorted(parsed) if key != "hash"
+            )
+
             # Compute expected hash
             computed_hash = hmac.new(
                 self._secret_key,
                 data_check_string.encode("utf-8"),
                 hashlib.sha256
             ).hexdigest()
-            
+
             # Compare hashes (timing-safe)
             if not hmac.compare_digest(computed_hash, received_hash):
                 return False, "Invalid hash - data may have been tampered with"
-            
+
             # Verify auth_date is not too old
-            auth_date_str = parsed.get("auth_date", [None])[0]
+            auth_date_str = parsed.get("auth_date")
             if auth_date_str:
                 try:
                     auth_date = datetime.fromtimestamp(int(auth_date_str))
@@ -148,33 +171,31 @@ class TelegramAuthService:
                         return False, f"initData expired (age: {age.total_seconds()}s, max: {max_age_seconds}s)"
                 except (ValueError, TypeError):
                     return False, "Invalid auth_date format"
-            
+
             return True, None
-            
+
         except Exception as e:
             return False, f"Validation error: {str(e)}"
-    
-    def parse_init_data(self, init_data: str) -> Optional[ParsedInitData]:
+
+    def _build_from_parsed(self, parsed: dict) -> Optional[ParsedInitData]:
         """
-        Parse initData and extract user information.
-        
+        Build a ParsedInitData from an already-parsed initData dict.
+
         Args:
-            init_data: Raw initData string from Telegram
-            
+            parsed: Flat {key: value} dict from _parse_query
+
         Returns:
-            ParsedInitData object or None if parsing fails
+            ParsedInitData object or None if the user data is invalid
         """
         try:
-            parsed = parse_qs(init_data, keep_blank_values=True)
-            
             # Parse user JSON
-            user_json = parsed.get("user", [None])[0]
+            user_json = parsed.get("user")
             if not user_json:
                 return None
-            
+
             # Decode URL-encoded JSON and parse
             user_data = json.loads(unquote(user_json))
-            
+
             # Create TelegramUser object
             user = TelegramUser(
                 id=user_data["id"],
@@ -185,25 +206,51 @@ class TelegramAuthService:
                 is_premium=user_data.get("is_premium", False),
                 photo_url=user_data.get("photo_url")
             )
-            
+
             # Parse auth_date
-            auth_date_str = parsed.get("auth_date", ["0"])[0]
-            auth_date = datetime.fromtimestamp(int(auth_date_str))
-            
-            # Get start_param (referral code from deep link)
-            start_param = parsed.get("start_param", [None])[0]
-            
+            auth_date = datetime.fromtimestamp(int(parsed.get("auth_date", "0")))
+
             return ParsedInitData(
                 user=user,
                 auth_date=auth_date,
-                hash=parsed.get("hash", [""])[0],
-                start_param=start_param,
-                query_id=parsed.get("query_id", [None])[0]
+                hash=parsed.get("hash", ""),
+                # start_param carries the referral code from the deep link
+                start_param=parsed.get("start_param"),
+                query_id=parsed.get("query_id")
             )
-            
+
         except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
-            print(f"Error parsing initData: {e}")
+            logger.warning("Error parsing initData: %s", e)
             return None
+
+    def validate_init_data(
+        self,
+        init_data: str,
+        max_age_seconds: int = 86400
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Validate initData from Telegram WebApp.
+
+        Args:
+            init_data: Raw initData string from Telegram
+            max_age_seconds: Maximum age of initData in seconds (default 24h)
+
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        return self._validate_parsed(self._parse_query(init_data), max_age_seconds)
+
+    def parse_init_data(self, init_data: str) -> Optional[ParsedInitData]:
+        """
+        Parse initData and extract user information.
+
+        Args:
+            init_data: Raw initData string from Telegram
+
+        Returns:
+            ParsedInitData object or None if parsing fails
+        """
+        return self._build_from_parsed(self._parse_query(init_data))
     
     def validate_and_parse(
         self, 
@@ -220,16 +267,45 @@ class TelegramAuthService:
         Returns:
             Tuple of (ParsedInitData or None, error_message or None)
         """
+        cache_key = hashlib.blake2b(
+            init_data.encode("utf-8"), digest_size=16
+        ).digest()
+
+        cached = self._validated_cache.get(cache_key)
+        if cached is not None:
+            # Signature already verified for this exact payload; only
+            # the freshness window needs re-checking
+            age = datetime.now() - cached.auth_date
+            if age <= timedelta(seconds=max_age_seconds):
+                self._validated_cache.move_to_end(cache_key)
+                return cached, None
+            del self._validated_cache[cache_key]
+            return None, (
+                f"initData expired (age: {age.total_seconds()}s, "
+                f"max: {max_age_seconds}s)"
+            )
+
+        # Parse the query string once and share it between validation
+        # and extraction - previously both steps re-ran the parser
+        query = self._parse_query(init_data)
+
         # First validate
-        is_valid, error = self.validate_init_data(init_data, max_age_seconds)
+        is_valid, error = self._validate_parsed(query, max_age_seconds)
         if not is_valid:
             return None, error
-        
-        # Then parse
-        parsed = self.parse_init_data(init_data)
+
+        # Then build the parsed payload
+        parsed = self._build_from_parsed(query)
         if not parsed:
             return None, "Failed to parse user data from initData"
-        
+
+        # Only cache payloads carrying a real auth_date, since that is
+        # all a cache hit re-checks
+        if parsed.auth_date.timestamp() > 0:
+            self._validated_cache[cache_key] = parsed
+            if len(self._validated_cache) > _VALIDATED_CACHE_MAX_SIZE:
+                self._validated_cache.popitem(last=False)
+
         return parsed, None
 
 
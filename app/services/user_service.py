@@ -2,17 +2,100 @@
 User service for managing user data.
 """
 
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, lambda_stmt, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 
+from app.models.friendship import Friendship
 from app.models.user import User
 from app.services.telegram_auth import TelegramUser
 from app.config import settings
 
 
+def _clean_referral_code(referral_code: str) -> str:
+    """
+    Normalize a client-sent referral code to its stored form.
+
+    Strips the REF_ prefix by slicing - unlike replace() this stops at
+    the prefix instead of scanning the whole string, and the common
+    prefix-less case allocates nothing extra. upper() stays: stored
+    codes are uppercase but clients may send lowercase.
+    """
+    return (
+        referral_code[4:] if referral_code.startswith("REF_")
+        else referral_code
+    ).upper()
+
+
+def _cache_get(db: AsyncSession, key: tuple) -> Optional[User]:
+    """Look up a user in the session's request-scoped cache."""
+    return db.info.get("_user_cache", {}).get(key)
+
+
+def _cache_put(db: AsyncSession, user: Optional[User]) -> Optional[User]:
+    """
+    Store a fetched user under all three lookup keys.
+
+    The cache lives on AsyncSession.info, so it exists exactly as long
+    as the request's session and needs no invalidation. Caching under
+    every key means a get_by_telegram_id hit also serves a later
+    get_by_id or get_by_referral_code for the same user within the
+    request. Misses are not cached - a user absent at the start of a
+    request may be created later in the same request.
+    """
+    if user is not None:
+        cache = db.info.setdefault("_user_cache", {})
+        cache[("id", user.id)] = user
+        cache[("tg", user.telegram_id)] = user
+        cache[("ref", user.referral_code)] = user
+    return user
+
+
+def _user_select(load_relations: bool):
+    """
+    Build the base user SELECT.
+
+    Plain lookups load only the columns the auth and social handlers
+    actually read, trimming the wire payload and row construction;
+    untouched columns (last_name, language_code, timestamps, ...) stay
+    deferred. With load_relations, friendships (with their friend users)
+    and the referrer are fetched eagerly via selectinload - one batched
+    WHERE IN SELECT per relationship instead of one lazy SELECT per row
+    when the caller walks them.
+    """
+    stmt = select(User)
+    if load_relations:
+        stmt = stmt.options(
+            selectinload(User.friendships).selectinload(Friendship.friend),
+            selectinload(User.referred_by),
+        )
+    else:
+        stmt = stmt.options(
+            load_only(
+                User.id,
+                User.telegram_id,
+                User.username,
+                User.first_name,
+                User.photo_url,
+                User.level,
+                User.watts,
+                User.referral_code,
+                User.referred_by_id,
+                User.referrals_count,
+                User.last_login_at,
+            )
+        )
+    return stmt
+
+
+# Retries for referral-code collisions on insert; with an 8-character
+# code a single collision is already vanishingly rare
+_MAX_CODE_ATTEMPTS = 5
+
+
 class UserService:
     """
     Service for user management operations.
@@ -21,44 +104,70 @@ class UserService:
     """
     
     async def get_by_telegram_id(
-        self, 
-        db: AsyncSession, 
-        telegram_id: int
+        self,
+        db: AsyncSession,
+        telegram_id: int,
+        load_relations: bool = False
     ) -> Optional[User]:
         """
         Find a user by their Telegram ID.
-        
+
         Args:
             db: Database session
             telegram_id: Telegram user ID
-            
+            load_relations: Eagerly load friendships (with friend users)
+                and the referrer to avoid N+1 lazy loads
+
         Returns:
             User object or None if not found
         """
-        result = await db.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        return result.scalar_one_or_none()
-    
+        # Cached objects carry no eager relations, so only plain lookups
+        # may be served from the request-scoped cache
+        if not load_relations:
+            cached = _cache_get(db, ("tg", telegram_id))
+            if cached is not None:
+                return cached
+            # lambda_stmt caches the constructed statement by lambda
+            # identity, so repeat calls skip rebuilding the select AST
+            # and go straight to the compiled-SQL cache
+            stmt = lambda_stmt(lambda: _user_select(False))
+            stmt += lambda s: s.where(User.telegram_id == telegram_id)
+        else:
+            stmt = _user_select(True).where(User.telegram_id == telegram_id)
+
+        result = await db.execute(stmt)
+        return _cache_put(db, result.scalar_one_or_none())
+
     async def get_by_id(
-        self, 
-        db: AsyncSession, 
-        user_id: int
+        self,
+        db: AsyncSession,
+        user_id: int,
+        load_relations: bool = False
     ) -> Optional[User]:
         """
         Find a user by their internal ID.
-        
+
         Args:
             db: Database session
             user_id: Internal user ID
-            
+            load_relations: Eagerly load friendships (with friend users)
+                and the referrer to avoid N+1 lazy loads
+
         Returns:
             User object or None if not found
         """
+        if not load_relations:
+            cached = _cache_get(db, ("id", user_id))
+            if cached is not None:
+                return cached
+            # session.get consults the identity map first and can return
+            # without emitting SQL at all on a repeat hit
+            return _cache_put(db, await db.get(User, user_id))
+
         result = await db.execute(
-            select(User).where(User.id == user_id)
+            _user_select(load_relations).where(User.id == user_id)
         )
-        return result.scalar_one_or_none()
+        return _cache_put(db, result.scalar_one_or_none())
     
     async def get_by_referral_code(
         self, 
@@ -75,13 +184,62 @@ class UserService:
         Returns:
             User object or None if not found
         """
-        # Clean the code (remove REF_ prefix if present)
-        clean_code = referral_code.replace("REF_", "").upper()
-        
+        clean_code = _clean_referral_code(referral_code)
+
+        cached = _cache_get(db, ("ref", clean_code))
+        if cached is not None:
+            return cached
+
+        stmt = lambda_stmt(lambda: _user_select(False))
+        stmt += lambda s: s.where(User.referral_code == clean_code)
+
+        result = await db.execute(stmt)
+        return _cache_put(db, result.scalar_one_or_none())
+
+    async def get_login_pair(
+        self,
+        db: AsyncSession,
+        telegram_id: int,
+        referral_code: Optional[str] = None
+    ) -> Tuple[Optional[User], Optional[User]]:
+        """
+        Fetch the logging-in user and the referral-code owner together.
+
+        The two lookups at the top of the auth flow are independent, so
+        instead of awaiting them one after the other they are folded
+        into a single SELECT over both indexed columns - one round-trip
+        where the sequential form paid two.
+
+        Args:
+            db: Database session
+            telegram_id: Telegram ID of the user logging in
+            referral_code: Referral code from the request, if any
+
+        Returns:
+            Tuple of (user, referrer), either of which may be None
+        """
+        if not referral_code:
+            return await self.get_by_telegram_id(db, telegram_id), None
+
+        clean_code = _clean_referral_code(referral_code)
+
         result = await db.execute(
-            select(User).where(User.referral_code == clean_code)
+            _user_select(False).where(
+                or_(
+                    User.telegram_id == telegram_id,
+                    User.referral_code == clean_code,
+                )
+            )
         )
-        return result.scalar_one_or_none()
+
+        user = referrer = None
+        for row in result.scalars():
+            _cache_put(db, row)
+            if row.telegram_id == telegram_id:
+                user = row
+            if row.referral_code == clean_code:
+                referrer = row
+        return user, referrer
     
     async def create_user(
         self, 
@@ -91,18 +249,22 @@ class UserService:
     ) -> User:
         """
         Create a new user from Telegram data.
-        
+
+        The referral code is not pre-checked for uniqueness: a pre-check
+        SELECT is both an extra round-trip and racy under concurrent
+        signups. Instead the unique index on referral_code arbitrates -
+        the insert is attempted inside a SAVEPOINT and retried with a
+        fresh code on collision, so the happy path is exactly one
+        statement.
+
         Args:
             db: Database session
             telegram_user: Telegram user data
             initial_watts: Initial watts for new user
-            
+
         Returns:
             Created User object
         """
-        # Generate unique referral code
-        referral_code = await self._generate_unique_referral_code(db)
-        
         user = User(
             telegram_id=telegram_user.id,
             username=telegram_user.username,
@@ -111,43 +273,65 @@ class UserService:
             photo_url=telegram_user.photo_url,
             language_code=telegram_user.language_code,
             is_premium=telegram_user.is_premium,
-            referral_code=referral_code,
+            referral_code=User.generate_referral_code(
+                settings.referral_code_length
+            ),
             watts=initial_watts,
             level=1
         )
-        
-        db.add(user)
-        await db.flush()  # Get the ID without committing
-        await db.refresh(user)
-        
-        return user
+
+        for attempt in range(_MAX_CODE_ATTEMPTS):
+            try:
+                # SAVEPOINT keeps a collision from poisoning the outer
+                # transaction, so only the failed INSERT is rolled back
+                async with db.begin_nested():
+                    db.add(user)
+                    # Flush gets the ID without committing; eager_defaults
+                    # on the model brings back server-generated columns in
+                    # the same INSERT ... RETURNING, so no refresh SELECT
+                    await db.flush()
+                return _cache_put(db, user)
+            except IntegrityError:
+                if attempt == _MAX_CODE_ATTEMPTS - 1:
+                    raise
+                # Referral-code collision - regenerate and retry
+                user.referral_code = User.generate_referral_code(
+                    settings.referral_code_length
+                )
     
-    async def _generate_unique_referral_code(self, db: AsyncSession) -> str:
+    async def update_login_and_watts(
+        self,
+        db: AsyncSession,
+        user: User,
+        watts_delta: int = 0
+    ) -> User:
         """
-        Generate a unique referral code.
-        
-        Keeps generating until a unique code is found.
-        
+        Stamp the login time and adjust watts in a single UPDATE.
+
+        The login flow used to touch last_login_at and watts in separate
+        statements; combining them halves write round-trips on the
+        hottest endpoint. The timestamp comes from the database's own
+        now() so no value crosses the wire.
+
         Args:
             db: Database session
-            
+            user: User to update
+            watts_delta: Watts to add (may be zero)
+
         Returns:
-            Unique referral code
+            The same User object (in-memory columns are not refreshed;
+            the login response doesn't serialize them)
         """
-        max_attempts = 10
-        for _ in range(max_attempts):
-            code = User.generate_referral_code(settings.referral_code_length)
-            
-            # Check if code already exists
-            existing = await db.execute(
-                select(User.id).where(User.referral_code == code)
-            )
-            if not existing.scalar_one_or_none():
-                return code
-        
-        # If we couldn't generate unique code, use longer one
-        return User.generate_referral_code(settings.referral_code_length + 4)
-    
+        values = {"last_login_at": func.now()}
+        if watts_delta:
+            # Server-side increment: atomic under concurrent requests
+            values["watts"] = User.watts + watts_delta
+
+        await db.execute(
+            update(User).where(User.id == user.id).values(**values)
+        )
+        return user
+
     async def update_last_login(
         self, 
         db: AsyncSession, 
@@ -155,16 +339,23 @@ class UserService:
     ) -> User:
         """
         Update user's last login timestamp.
-        
+
+        The database stamps the column with its own now() - no Python
+        clock read, no timestamp serialized over the wire, and no skew
+        between app servers.
+
         Args:
             db: Database session
             user: User to update
-            
+
         Returns:
             Updated User object
         """
-        user.last_login_at = datetime.utcnow()
-        await db.flush()
+        await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(last_login_at=func.now())
+        )
         return user
     
     async def add_watts(
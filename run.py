@@ -27,7 +27,13 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level="debug" if settings.debug else "info"
+        # uvloop and httptools (from uvicorn[standard]) replace the
+        # default asyncio/h11 stack with C implementations
+        loop="uvloop",
+        http="httptools",
+        # Debug-level request logging is itself a per-request cost;
+        # only pay it in local development
+        log_level="debug" if settings.app_env == "development" else "info"
     )
 
 
@@ -0,0 +1,108 @@
+"""
+Shared helper for building mock Telegram initData in tests.
+"""
+
+import hashlib
+import hmac
+import time
+from functools import lru_cache
+from urllib.parse import quote
+
+import orjson
+
+from app.config import settings
+
+# Pinned once at import: tests never check freshness, and a stable
+# auth_date makes identical calls cacheable across a test module
+_AUTH_DATE = str(int(time.time()))
+
+
+@lru_cache(maxsize=4)
+def _secret_key(bot_token: str) -> bytes:
+    """Telegram WebApp secret key, derived once per bot token."""
+    return hmac.new(
+        b"WebAppData",
+        bot_token.encode("utf-8"),
+        hashlib.sha256
+    ).digest()
+
+
+@lru_cache(maxsize=128)
+def create_mock_init_data(
+    user_id: int = 123456789,
+    username: str = "testuser",
+    first_name: str = "Test",
+    start_param: str = None,
+    bot_token: str = None
+) -> str:
+    """
+    Create a valid mock Telegram initData for testing.
+
+    Results are cached per argument tuple, so tests that sign in the
+    same mock user repeatedly pay the JSON + HMAC cost once.
+
+    Args:
+        user_id: Telegram user ID
+        username: Telegram username
+        first_name: User's first name
+        start_param: Referral code from deep link
+        bot_token: Bot token for signing (uses settings if not provided)
+
+    Returns:
+        Valid initData string
+    """
+    if bot_token is None:
+        bot_token = settings.telegram_bot_token
+
+    # Build user object
+    user_data = {
+        "id": user_id,
+        "first_name": first_name,
+        "username": username,
+        "language_code": "en",
+        "is_premium": False
+    }
+
+    # Build data dictionary
+    data = {
+        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
+        # orjson serializes in C; Telegram carries the JSON as a string
+        # inside the query, hence the decode
+        "user": orjson.dumps(user_data).decode(),
+        "auth_date": _AUTH_DATE,
+    }
+
+    if start_param:
+        data["start_param"] = start_param
+
+    # The key set is fixed, so the alphabetical order Telegram requires
+    # (auth_date < query_id < start_param < user) is hard-coded instead
+    # of sorting on every call
+    parts = [
+        f"auth_date={data['auth_date']}",
+        f"query_id={data['query_id']}",
+    ]
+    if start_param:
+        parts.append(f"start_param={data['start_param']}")
+    parts.append(f"user={data['user']}")
+    data_check_string = "\n".join(parts)
+
+    # Compute hash (hmac.digest is the one-shot C fast path)
+    computed_hash = hmac.digest(
+        _secret_key(bot_token),
+        data_check_string.encode("utf-8"),
+        "sha256"
+    ).hex()
+
+    data["hash"] = computed_hash
+
+    # Only the user JSON needs percent-encoding; the other fields are
+    # URL-safe already, so skip urlencode's per-field quoting
+    init_data = (
+        f"query_id={data['query_id']}"
+        f"&user={quote(data['user'])}"
+        f"&auth_date={data['auth_date']}"
+    )
+    if start_param:
+        init_data += f"&start_param={data['start_param']}"
+    return init_data + f"&hash={computed_hash}"
@@ -8,8 +8,10 @@ from typing import AsyncGenerator, Generator
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import raiseload
+from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
 from app.main import app
@@ -18,6 +20,35 @@ from app.main import app
 # Test database URL (use SQLite for testing)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# Set per test so the session-scoped client's get_db override always
+# hands out the current test's session
+_session_holder: dict = {}
+
+
+def _install_lazyload_guard(session: AsyncSession) -> None:
+    """
+    Make lazy relationship access raise instead of emitting SQL.
+
+    Every top-level ORM SELECT gets a wildcard raiseload("*") appended,
+    so entities it loads raise InvalidRequestError the moment a handler
+    walks a relationship that wasn't eagerly loaded - N+1 regressions
+    fail the test instead of silently adding queries. Explicit loader
+    options (selectinload, contains_eager) override the wildcard, and
+    column/relationship loads are left alone so eager loading itself
+    keeps working.
+    """
+
+    @event.listens_for(session.sync_session, "do_orm_execute")
+    def _raise_on_lazy(execute_state):
+        if (
+            execute_state.is_select
+            and not execute_state.is_column_load
+            and not execute_state.is_relationship_load
+        ):
+            execute_state.statement = execute_state.statement.options(
+                raiseload("*")
+            )
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
@@ -27,51 +58,74 @@ def event_loop() -> Generator:
     loop.close()
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest_asyncio.fixture(scope="session")
 async def test_engine():
-    """Create a test database engine."""
+    """
+    Create the test database engine once per session.
+
+    Schema DDL runs a single time; per-test isolation comes from the
+    transaction rollback in test_session, not from rebuilding tables.
+    """
     engine = create_async_engine(
         TEST_DATABASE_URL,
-        poolclass=NullPool,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
     )
-    
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
+
     yield engine
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    
+
     await engine.dispose()
 
 
 @pytest_asyncio.fixture(scope="function")
 async def test_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    async_session_maker = async_sessionmaker(
-        test_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-    
-    async with async_session_maker() as session:
+    """
+    Create a test database session inside a throwaway transaction.
+
+    The session joins an outer connection-level transaction via
+    savepoints, so commits issued by the app land in savepoints and the
+    final rollback wipes everything the test wrote.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        _install_lazyload_guard(session)
+
         yield session
 
+        await session.close()
+        await trans.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _shared_client() -> AsyncGenerator[AsyncClient, None]:
+    """Create the HTTP client and ASGI transport once per session."""
 
-@pytest_asyncio.fixture(scope="function")
-async def client(test_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test HTTP client."""
-    
     async def override_get_db():
-        yield test_session
-    
+        yield _session_holder["session"]
+
     app.dependency_overrides[get_db] = override_get_db
-    
+
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
-    
+
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def client(
+    _shared_client: AsyncClient,
+    test_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Point the shared client at this test's session."""
+    _session_holder["session"] = test_session
+    yield _shared_client
+    _session_holder.pop("session", None)
@@ -2,83 +2,11 @@
 Tests for authentication endpoints.
 """
 
-import hashlib
-import hmac
-import json
-import time
-from urllib.parse import urlencode, quote
-
 import pytest
 from httpx import AsyncClient
 
 from app.config import settings
-
-
-def create_mock_init_data(
-    user_id: int = 123456789,
-    username: str = "testuser",
-    first_name: str = "Test",
-    start_param: str = None,
-    bot_token: str = None
-) -> str:
-    """
-    Create a valid mock Telegram initData for testing.
-    
-    Args:
-        user_id: Telegram user ID
-        username: Telegram username
-        first_name: User's first name
-        start_param: Referral code from deep link
-        bot_token: Bot token for signing (uses settings if not provided)
-        
-    Returns:
-        Valid initData string
-    """
-    if bot_token is None:
-        bot_token = settings.telegram_bot_token
-    
-    # Build user object
-    user_data = {
-        "id": user_id,
-        "first_name": first_name,
-        "username": username,
-        "language_code": "en",
-        "is_premium": False
-    }
-    
-    # Build data dictionary
-    data = {
-        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
-        "user": json.dumps(user_data),
-        "auth_date": str(int(time.time())),
-    }
-    
-    if start_param:
-        data["start_param"] = start_param
-    
-    # Sort keys and build data check string
-    data_check_arr = []
-    for key in sorted(data.keys()):
-        data_check_arr.append(f"{key}={data[key]}")
-    data_check_string = "\n".join(data_check_arr)
-    
-    # Compute hash
-    secret_key = hmac.new(
-        b"WebAppData",
-        bot_token.encode("utf-8"),
-        hashlib.sha256
-    ).digest()
-    
-    computed_hash = hmac.new(
-        secret_key,
-        data_check_string.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
-    
-    data["hash"] = computed_hash
-    
-    # Build query string
-    return urlencode(data)
+from tests._mockinit import create_mock_init_data
 
 
 class TestAuthEndpoints:
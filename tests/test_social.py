@@ -2,65 +2,11 @@
 Tests for social endpoints.
 """
 
-import hashlib
-import hmac
-import json
-import time
-from urllib.parse import urlencode
-
 import pytest
 from httpx import AsyncClient
 
 from app.config import settings
-
-
-def create_mock_init_data(
-    user_id: int = 123456789,
-    username: str = "testuser",
-    first_name: str = "Test",
-    start_param: str = None,
-    bot_token: str = None
-) -> str:
-    """Create a valid mock Telegram initData for testing."""
-    if bot_token is None:
-        bot_token = settings.telegram_bot_token
-    
-    user_data = {
-        "id": user_id,
-        "first_name": first_name,
-        "username": username,
-        "language_code": "en",
-        "is_premium": False
-    }
-    
-    data = {
-        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
-        "user": json.dumps(user_data),
-        "auth_date": str(int(time.time())),
-    }
-    
-    if start_param:
-        data["start_param"] = start_param
-    
-    data_check_arr = []
-    for key in sorted(data.keys()):
-        data_check_arr.append(f"{key}={data[key]}")
-    data_check_string = "\n".join(data_check_arr)
-    
-    secret_key = hmac.new(
-        b"WebAppData",
-        bot_token.encode("utf-8"),
-        hashlib.sha256
-    ).digest()
-    
-    computed_hash = hmac.new(
-        secret_key,
-        data_check_string.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
-    
-    data["hash"] = computed_hash
-    return urlencode(data)
+from tests._mockinit import create_mock_init_data
 
 
 async def create_authenticated_user(
@@ -202,6 +148,76 @@ class TestSocialEndpoints:
         assert data["totalFriendsInvited"] == 3
         assert data["totalBonusEarned"] == settings.referral_bonus_watts * 3
     
+    @pytest.mark.asyncio
+    async def test_friends_pagination(self, client: AsyncClient):
+        """Test cursor pagination over the friends list."""
+        # Create referrer with 5 friends
+        referrer_token, referrer_code = await create_authenticated_user(
+            client, 400000001, "pageref"
+        )
+        for i in range(5):
+            await create_authenticated_user(
+                client, 400000002 + i, f"pagefriend{i}",
+                referral_code=referrer_code
+            )
+        headers = {"Authorization": f"Bearer {referrer_token}"}
+
+        # Full first page: real total and a cursor for the next page
+        response1 = await client.get(
+            "/social/friends", params={"limit": 2}, headers=headers
+        )
+        assert response1.status_code == 200
+        page1 = response1.json()
+        assert len(page1["friends"]) == 2
+        assert page1["totalFriends"] == 5
+        assert page1["nextCursor"] is not None
+
+        # Second page: no overlap with the first
+        response2 = await client.get(
+            "/social/friends",
+            params={"limit": 2, "cursor": page1["nextCursor"]},
+            headers=headers
+        )
+        assert response2.status_code == 200
+        page2 = response2.json()
+        assert len(page2["friends"]) == 2
+        assert page2["nextCursor"] is not None
+
+        # Final short page: remaining friend, no further cursor
+        response3 = await client.get(
+            "/social/friends",
+            params={"limit": 2, "cursor": page2["nextCursor"]},
+            headers=headers
+        )
+        assert response3.status_code == 200
+        page3 = response3.json()
+        assert len(page3["friends"]) == 1
+        assert page3["totalFriends"] == 5
+        assert page3["nextCursor"] is None
+
+        # The three pages cover all 5 friends exactly once
+        seen = [
+            friend["playerId"]
+            for page in (page1, page2, page3)
+            for friend in page["friends"]
+        ]
+        assert len(seen) == len(set(seen)) == 5
+
+    @pytest.mark.asyncio
+    async def test_friends_invalid_cursor(self, client: AsyncClient):
+        """Test that a malformed cursor is rejected."""
+        token, _ = await create_authenticated_user(
+            client, 500000001, "badcursor"
+        )
+
+        response = await client.get(
+            "/social/friends",
+            params={"cursor": "not-a-cursor"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_mutual_friendship(self, client: AsyncClient):
         """Test that referral creates mutual friendship."""